@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from app.database import get_db, CallLog, Ticket
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+from app.services.archive import call_log_archiver
+from typing import List, Dict, Any, Optional
+from datetime import date, datetime, timedelta
 from sqlalchemy import func
 
 router = APIRouter()
@@ -10,7 +12,7 @@ router = APIRouter()
 class LiveCallResponse(BaseModel):
     id: int
     caller_id: str
-    transcript: str
+    transcript: Optional[str] = None  # None once the call has been archived
     sentiment: str
     summary: str
     timestamp: datetime
@@ -51,3 +53,35 @@ async def get_call_volume(db: Session = Depends(get_db)):
         count = db.query(CallLog).filter(CallLog.timestamp >= start_of_day, CallLog.timestamp < end_of_day).count()
         call_volume_data.append({"date": date.isoformat(), "count": count})
     return call_volume_data
+
+@router.post("/dashboard/archive/run")
+def run_call_log_archive(retention_days: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    Moves call logs older than the retention window into the Parquet archive.
+    Plain def so FastAPI runs it in the threadpool instead of blocking the event loop.
+    """
+    if retention_days is not None and retention_days < 0:
+        raise HTTPException(status_code=400, detail="retention_days must be non-negative")
+    result = call_log_archiver.archive(db, retention_days)
+    return {"status": "success", "archived": result["archived"], "cutoff": result["cutoff"], "files": len(result["files"])}
+
+@router.get("/dashboard/history")
+def get_call_history(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    caller_id: Optional[str] = None,
+    sentiment: Optional[str] = None,
+    language: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=5000)
+):
+    """
+    Historical report over archived call logs.
+    """
+    return call_log_archiver.query(
+        start_date=start_date,
+        end_date=end_date,
+        caller_id=caller_id,
+        sentiment=sentiment,
+        language=language,
+        limit=limit
+    )
@@ -18,6 +18,8 @@ class Settings(BaseSettings):
     # Ollama Settings
     OLLAMA_HOST: str = "http://localhost:11434"
     LLM_MODEL_NAME: str = "llama3:8b"
+    LLM_KEEP_ALIVE: str = "30m"  # Keeps the model and its cached prompt prefix loaded between calls
+    LLM_NUM_PREDICT: int = 48  # A classification object is ~25 tokens
 
     # API URLs for Mock Integrations (or real ones)
     AAMER_API_URL: str = "http://localhost:8000/api/v1/mocks/aamer"
@@ -29,6 +31,12 @@ class Settings(BaseSettings):
 
     # Thresholds
     LATENCY_THRESHOLD_MS: int = 700
+
+    # Call Log Retention / Archive
+    CALL_LOG_ARCHIVE_DIR: str = "data/archive/call_logs"
+    CALL_LOG_RETENTION_DAYS: int = 30
+    CALL_LOG_ARCHIVE_BATCH_SIZE: int = 5000
+    CALL_LOG_ARCHIVE_INTERVAL_HOURS: float = 24  # 0 disables the scheduled job
     
     class Config:
         env_file = ".env"
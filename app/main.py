@@ -1,9 +1,12 @@
+import asyncio
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
 from app.api.v1.endpoints.dashboard_api import router as dashboard_router
 from app.database import create_db_and_tables
+from app.services.archive import call_log_archiver
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -24,12 +27,25 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 # Include dashboard API router
 app.include_router(dashboard_router, prefix=f"{settings.API_V1_STR}")
 
+async def call_log_archive_loop():
+    """
+    Runs the call log retention job periodically, off the event loop.
+    """
+    while True:
+        try:
+            await run_in_threadpool(call_log_archiver.run_retention_job)
+        except Exception as e:
+            print(f"Archive: Retention job failed: {e}")
+        await asyncio.sleep(settings.CALL_LOG_ARCHIVE_INTERVAL_HOURS * 3600)
+
 @app.on_event("startup")
 async def startup():
     """
-    Startup event to create database tables automatically.
+    Startup event to create database tables automatically and schedule the call log retention job.
     """
     create_db_and_tables()
+    if settings.CALL_LOG_ARCHIVE_INTERVAL_HOURS > 0:
+        app.state.archive_task = asyncio.create_task(call_log_archive_loop())
 
 @app.get("/")
 async def root():
@@ -0,0 +1,179 @@
+from typing import Dict, Any, List, Optional
+from datetime import datetime, date, timedelta
+from collections import defaultdict
+import glob
+import os
+import re
+import threading
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.database import SessionLocal, CallLog
+
+# Summaries kept in the hot table after archiving are capped to this length
+SLIM_SUMMARY_MAX_CHARS = 255
+
+ARCHIVE_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("caller_id", pa.string()),
+    ("transcript", pa.large_string()),
+    ("sentiment", pa.string()),
+    ("summary", pa.large_string()),
+    ("timestamp", pa.timestamp("us")),
+    ("language", pa.string()),
+])
+
+# Archives are laid out as <root>/date=YYYY-MM-DD/part-<first_id>-<last_id>.parquet
+DATE_PARTITIONING = ds.partitioning(pa.schema([("date", pa.date32())]), flavor="hive")
+PART_FILE_PATTERN = re.compile(r"^part-(\d+)-(\d+)\.parquet$")
+
+
+class CallLogArchiver:
+    """
+    Retention job for call_logs.
+    Moves transcripts older than the retention window into zstd-compressed,
+    date-partitioned Parquet files and leaves a slim summary row in the hot table.
+    """
+    def __init__(self):
+        self.root = settings.CALL_LOG_ARCHIVE_DIR
+        self._lock = threading.Lock()
+
+    def run_retention_job(self) -> Dict[str, Any]:
+        """
+        Entry point for the scheduled job and the CLI; runs one archive pass on its own session.
+        """
+        db = SessionLocal()
+        try:
+            return self.archive(db)
+        finally:
+            db.close()
+
+    def archive(self, db: Session, retention_days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Archives every call log from before midnight `retention_days` ago (defaults to CALL_LOG_RETENTION_DAYS).
+        Works in id-ordered batches up to the max qualifying id taken at the start of the run; each batch
+        is written to disk before the hot rows are slimmed. The cutoff is day-aligned so every archived
+        date partition is complete, which lets a batch replace any part file left behind by a crashed run.
+
+        A NULL transcript marks a row as archived, so rows that never had a transcript are deliberately
+        skipped: they stay in the hot table with their full summary and do not appear in query().
+        """
+        if retention_days is None:
+            retention_days = settings.CALL_LOG_RETENTION_DAYS
+        cutoff = datetime.combine(date.today() - timedelta(days=retention_days), datetime.min.time())
+
+        with self._lock:
+            qualifying = db.query(CallLog).filter(
+                CallLog.timestamp < cutoff,
+                CallLog.transcript.isnot(None)
+            )
+            max_id = qualifying.with_entities(func.max(CallLog.id)).scalar()
+
+            archived = 0
+            files = []
+            while max_id is not None:
+                rows = qualifying.filter(CallLog.id <= max_id).order_by(CallLog.id).limit(
+                    settings.CALL_LOG_ARCHIVE_BATCH_SIZE).all()
+                if not rows:
+                    break
+
+                by_date = defaultdict(list)
+                for row in rows:
+                    by_date[row.timestamp.date()].append(row)
+                for day, day_rows in by_date.items():
+                    files.append(self._write_partition(day, day_rows))
+
+                # Slim the hot rows only once their archive files are durable
+                for row in rows:
+                    row.transcript = None
+                    if row.summary and len(row.summary) > SLIM_SUMMARY_MAX_CHARS:
+                        row.summary = row.summary[:SLIM_SUMMARY_MAX_CHARS]
+                db.commit()
+                archived += len(rows)
+
+        print(f"Archive: Moved {archived} call logs older than {cutoff.date()} into {len(files)} files")
+        return {"archived": archived, "cutoff": cutoff, "files": files}
+
+    def _write_partition(self, day: date, rows: List[CallLog]) -> str:
+        partition_dir = os.path.join(self.root, f"date={day.isoformat()}")
+        os.makedirs(partition_dir, exist_ok=True)
+        first_id, last_id = rows[0].id, rows[-1].id
+        filename = f"part-{first_id:012d}-{last_id:012d}.parquet"
+        path = os.path.join(partition_dir, filename)
+
+        table = pa.Table.from_pydict({
+            "id": [r.id for r in rows],
+            "caller_id": [r.caller_id for r in rows],
+            "transcript": [r.transcript for r in rows],
+            "sentiment": [r.sentiment for r in rows],
+            "summary": [r.summary for r in rows],
+            "timestamp": [r.timestamp for r in rows],
+            "language": [r.language for r in rows],
+        }, schema=ARCHIVE_SCHEMA)
+
+        # Write to a dot-prefixed temp file (skipped by dataset discovery) and rename,
+        # so readers never see a partial part file
+        tmp_path = os.path.join(partition_dir, f".{filename}.tmp")
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+
+        # The cutoff is day-aligned, so committed part files never overlap a new batch's id range in the
+        # same partition. An overlapping file is a leftover from a crashed run; its rows still have their
+        # transcripts in the hot table and are (re-)archived by this or a later batch, so it is dropped.
+        for existing in os.listdir(partition_dir):
+            match = PART_FILE_PATTERN.match(existing)
+            if match and existing != filename and int(match.group(1)) <= last_id and int(match.group(2)) >= first_id:
+                os.remove(os.path.join(partition_dir, existing))
+        return path
+
+    def query(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        caller_id: Optional[str] = None,
+        sentiment: Optional[str] = None,
+        language: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Scans archived call logs for historical reports.
+        Date bounds (inclusive) prune whole partitions; the remaining filters are pushed
+        down to the Parquet reader so row groups are skipped using column statistics.
+        """
+        if not glob.glob(os.path.join(self.root, "date=*", "*.parquet")):
+            return []
+
+        dataset = ds.dataset(self.root, format="parquet", schema=ARCHIVE_SCHEMA.append(pa.field("date", pa.date32())),
+                             partitioning=DATE_PARTITIONING)
+
+        conditions = []
+        if start_date is not None:
+            conditions.append(ds.field("date") >= start_date)
+        if end_date is not None:
+            conditions.append(ds.field("date") <= end_date)
+        if caller_id is not None:
+            conditions.append(ds.field("caller_id") == caller_id)
+        if sentiment is not None:
+            conditions.append(ds.field("sentiment") == sentiment)
+        if language is not None:
+            conditions.append(ds.field("language") == language)
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        scanner = dataset.scanner(columns=columns, filter=expression)
+        table = scanner.head(limit) if limit is not None else scanner.to_table()
+        return table.to_pylist()
+
+
+# Service instance
+call_log_archiver = CallLogArchiver()
+
+if __name__ == "__main__":
+    # python -m app.services.archive  (e.g. from cron)
+    call_log_archiver.run_retention_job()
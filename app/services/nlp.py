@@ -1,9 +1,69 @@
 from typing import Dict, Any
-import json
+from enum import Enum
+import time
 import ollama
+from pydantic import BaseModel, ValidationError, model_validator
 from app.core.config import settings
 
 
+class IssueType(str, Enum):
+    APPLIANCE = "Appliance"
+    PLUMBING = "Plumbing"
+    ELECTRICAL = "Electrical"
+    HVAC = "HVAC"
+    PEST_CONTROL = "Pest Control"
+    FIRE = "Fire"
+    GAS = "Gas"
+    OTHER = "Other"
+
+
+class Urgency(str, Enum):
+    EMERGENCY = "Emergency"
+    URGENT = "Urgent"
+    NON_EMERGENCY = "Non-Emergency"
+
+
+class Sentiment(str, Enum):
+    POSITIVE = "Positive"
+    NEUTRAL = "Neutral"
+    NEGATIVE = "Negative"
+
+
+class IntentClassification(BaseModel):
+    issue_type: IssueType
+    urgency: Urgency
+    sentiment: Sentiment
+
+    @model_validator(mode="after")
+    def fire_and_gas_are_emergencies(self):
+        # DispatcherEngine only transfers to 911 on Emergency + Fire/Gas
+        if self.issue_type in (IssueType.FIRE, IssueType.GAS):
+            self.urgency = Urgency.EMERGENCY
+        return self
+
+
+# JSON schema passed to Ollama's `format`; decoding is constrained to these enum values.
+# Requires ollama-python >= 0.4.4 (earlier clients reject a schema-valued format) and an Ollama server >= 0.5.
+CLASSIFICATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "issue_type": {"type": "string", "enum": [e.value for e in IssueType]},
+        "urgency": {"type": "string", "enum": [e.value for e in Urgency]},
+        "sentiment": {"type": "string", "enum": [e.value for e in Sentiment]},
+    },
+    "required": ["issue_type", "urgency", "sentiment"],
+}
+
+# Fixed system prompt: identical across calls so Ollama reuses its cached prefix
+# while the model is kept alive; only the short request text is evaluated per call.
+SYSTEM_PROMPT = (
+    "Classify a Saudi Aramco Community Services resident request. Reply with JSON only.\n"
+    f"issue_type: {', '.join(e.value for e in IssueType)}\n"
+    f"urgency: {', '.join(e.value for e in Urgency)}\n"
+    f"sentiment: {', '.join(e.value for e in Sentiment)}"
+)
+
+
 class NLPService:
     def __init__(self):
         self.client = ollama.Client(host=settings.OLLAMA_HOST)
@@ -12,75 +72,87 @@ class NLPService:
     async def classify_intent(self, text: str) -> Dict[str, Any]:
         """
         Classifies issue type, urgency, and sentiment using Llama 3/Jais via Ollama.
-        Uses keyword logic as a fallback if Ollama fails.
+        Output is schema-constrained and validated into IntentClassification;
+        token counts and generation time are reported under "usage".
+        Uses keyword logic as a fallback if Ollama fails or its output is truncated or invalid;
+        "usage" is None only when Ollama did not answer at all.
         """
-
-        prompt = f"""
-Analyze the following resident request for Saudi Aramco Community Services.
-The request is: "{text}"
-
-Perform the following analysis:
-1. Identify the primary Issue Type: Appliance, Plumbing, Electrical, HVAC, Pest Control, or Other.
-2. Determine the Urgency: Emergency, Urgent, or Non-Emergency.
-3. Determine the Sentiment: Positive, Neutral, or Negative.
-
-Return ONLY a JSON object in this format:
-{{"issue_type": "...", "urgency": "...", "sentiment": "..."}}
-"""
-
+        start_time = time.perf_counter()
         try:
             # 🔹 Real Ollama API Call
             response = self.client.generate(
                 model=self.model,
-                prompt=prompt,
-                format="json"
+                system=SYSTEM_PROMPT,
+                prompt=f'Request: "{text}"',
+                format=CLASSIFICATION_SCHEMA,
+                keep_alive=settings.LLM_KEEP_ALIVE,
+                options={"num_predict": settings.LLM_NUM_PREDICT, "temperature": 0}
             )
-
-            # Ollama returns response inside 'response' key as string
-            if "response" in response:
-                return json.loads(response["response"])
-            else:
-                raise ValueError("Invalid response from Ollama")
-
         except Exception as e:
             print(f"Ollama/LLM call failed: {e}. Falling back to keyword logic.")
-
-            # 🔹 Fallback Keyword Logic
-            text_lower = text.lower()
-
-            issue = "Other"
-            urgency = "Non-Emergency"
-            sentiment = "Neutral"
-
-            # Issue Detection
-            if any(word in text_lower for word in ["تسريب", "ماء", "سباكة", "plumbing", "leak", "water"]):
-                issue = "Plumbing"
-            elif any(word in text_lower for word in ["كهرباء", "انقطاع", "electrical", "power", "light"]):
-                issue = "Electrical"
-            elif any(word in text_lower for word in ["تكييف", "حار", "hvac", "ac", "cooling"]):
-                issue = "HVAC"
-            elif any(word in text_lower for word in ["ثلاجة", "فرن", "appliance", "fridge", "oven"]):
-                issue = "Appliance"
-            elif any(word in text_lower for word in ["حشرات", "pest", "bug"]):
-                issue = "Pest Control"
-
-            # Urgency Detection
-            if any(word in text_lower for word in ["حريق", "طوارئ", "خطر", "emergency", "fire", "danger"]):
-                urgency = "Emergency"
-            elif any(word in text_lower for word in ["عاجل", "urgent", "asap", "quickly"]):
-                urgency = "Urgent"
-
-            # Sentiment Detection
-            if any(word in text_lower for word in ["غاضب", "سيئ", "terrible", "angry", "bad"]):
-                sentiment = "Negative"
-            elif any(word in text_lower for word in ["شكرا", "ممتاز", "thank you", "great", "good"]):
-                sentiment = "Positive"
-
-            return {
-                "issue_type": issue,
-                "urgency": urgency,
-                "sentiment": sentiment
-            }
+            return {**self._keyword_fallback(text).model_dump(mode="json"), "usage": None}
+
+        # Ollama reported usage for this call even if its output turns out to be unusable
+        usage = {
+            "prompt_tokens": response.get("prompt_eval_count") or 0,
+            "completion_tokens": response.get("eval_count") or 0,
+            "generation_ms": (response.get("eval_duration") or 0) / 1e6,
+            "total_ms": (time.perf_counter() - start_time) * 1000
+        }
+        print(f"LLM Classification: {usage['prompt_tokens']} prompt + {usage['completion_tokens']} completion tokens, "
+              f"{usage['generation_ms']:.2f}ms generation, {usage['total_ms']:.2f}ms total")
+
+        if response.get("done_reason") == "length":
+            print(f"LLM output truncated at num_predict={settings.LLM_NUM_PREDICT}: {response.get('response')!r}. "
+                  f"Falling back to keyword logic.")
+            classification = self._keyword_fallback(text)
+        else:
+            try:
+                # Ollama returns the generated JSON inside 'response' key as string
+                classification = IntentClassification.model_validate_json(response.get("response") or "")
+            except ValidationError as e:
+                print(f"LLM returned an invalid classification: {e}. Falling back to keyword logic.")
+                classification = self._keyword_fallback(text)
+
+        return {**classification.model_dump(mode="json"), "usage": usage}
+
+    def _keyword_fallback(self, text: str) -> IntentClassification:
+        # 🔹 Fallback Keyword Logic
+        text_lower = text.lower()
+
+        issue = IssueType.OTHER
+        urgency = Urgency.NON_EMERGENCY
+        sentiment = Sentiment.NEUTRAL
+
+        # Issue Detection (Fire/Gas first so "gas leak" is not taken as plumbing)
+        if any(word in text_lower for word in ["حريق", "دخان", "fire", "smoke"]):
+            issue = IssueType.FIRE
+        elif any(word in text_lower for word in ["غاز", "gas"]):
+            issue = IssueType.GAS
+        elif any(word in text_lower for word in ["تسريب", "ماء", "سباكة", "plumbing", "leak", "water"]):
+            issue = IssueType.PLUMBING
+        elif any(word in text_lower for word in ["كهرباء", "انقطاع", "electrical", "power", "light"]):
+            issue = IssueType.ELECTRICAL
+        elif any(word in text_lower for word in ["تكييف", "حار", "hvac", "ac", "cooling"]):
+            issue = IssueType.HVAC
+        elif any(word in text_lower for word in ["ثلاجة", "فرن", "appliance", "fridge", "oven"]):
+            issue = IssueType.APPLIANCE
+        elif any(word in text_lower for word in ["حشرات", "pest", "bug"]):
+            issue = IssueType.PEST_CONTROL
+
+        # Urgency Detection (Fire and Gas are raised to Emergency by IntentClassification)
+        if any(word in text_lower for word in ["حريق", "طوارئ", "خطر", "emergency", "fire", "danger"]):
+            urgency = Urgency.EMERGENCY
+        elif any(word in text_lower for word in ["عاجل", "urgent", "asap", "quickly"]):
+            urgency = Urgency.URGENT
+
+        # Sentiment Detection
+        if any(word in text_lower for word in ["غاضب", "سيئ", "terrible", "angry", "bad"]):
+            sentiment = Sentiment.NEGATIVE
+        elif any(word in text_lower for word in ["شكرا", "ممتاز", "thank you", "great", "good"]):
+            sentiment = Sentiment.POSITIVE
+
+        return IntentClassification(issue_type=issue, urgency=urgency, sentiment=sentiment)
 
 
 # Service Instance
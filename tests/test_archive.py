@@ -0,0 +1,139 @@
+import os
+from datetime import datetime, date, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.config import settings
+from app.database import Base, CallLog
+from app.services.archive import CallLogArchiver, SLIM_SUMMARY_MAX_CHARS
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def archiver(tmp_path):
+    archiver = CallLogArchiver()
+    archiver.root = str(tmp_path / "call_logs")
+    return archiver
+
+
+def add_call(db, days_ago, caller_id="USR-1", sentiment="Neutral", summary="short summary", now=None):
+    call = CallLog(
+        caller_id=caller_id,
+        transcript=f"transcript from {days_ago} days ago",
+        sentiment=sentiment,
+        summary=summary,
+        timestamp=(now or datetime.now()) - timedelta(days=days_ago),
+        language="en"
+    )
+    db.add(call)
+    db.commit()
+    return call
+
+
+def test_archive_slims_old_rows_and_partitions_by_date(db, archiver):
+    old = add_call(db, 40, summary="x" * 1000)
+    recent = add_call(db, 1)
+
+    result = archiver.archive(db, retention_days=30)
+
+    assert result["archived"] == 1
+    db.refresh(old)
+    db.refresh(recent)
+    assert old.transcript is None
+    assert len(old.summary) == SLIM_SUMMARY_MAX_CHARS
+    assert recent.transcript is not None
+
+    partition = os.path.join(archiver.root, f"date={old.timestamp.date().isoformat()}")
+    assert os.listdir(partition) == [f"part-{old.id:012d}-{old.id:012d}.parquet"]
+
+    rows = archiver.query()
+    assert [r["id"] for r in rows] == [old.id]
+    assert rows[0]["transcript"] == "transcript from 40 days ago"
+    assert rows[0]["summary"] == "x" * 1000
+
+
+def test_archive_runs_in_batches(db, archiver, monkeypatch):
+    monkeypatch.setattr(settings, "CALL_LOG_ARCHIVE_BATCH_SIZE", 2)
+    for _ in range(5):
+        add_call(db, 40)
+
+    result = archiver.archive(db, retention_days=30)
+
+    assert result["archived"] == 5
+    assert len(result["files"]) == 3
+    assert db.query(CallLog).filter(CallLog.transcript.isnot(None)).count() == 0
+    assert sorted(r["id"] for r in archiver.query()) == [1, 2, 3, 4, 5]
+
+
+def test_rerun_after_new_rows_does_not_duplicate(db, archiver):
+    add_call(db, 40)
+    add_call(db, 40)
+    archiver.archive(db, retention_days=30)
+
+    add_call(db, 40)
+    add_call(db, 35)
+    archiver.archive(db, retention_days=30)
+
+    ids = [r["id"] for r in archiver.query()]
+    assert sorted(ids) == [1, 2, 3, 4]
+
+
+def test_rerun_after_crash_before_commit_does_not_duplicate(db, archiver, monkeypatch):
+    add_call(db, 40)
+    add_call(db, 40)
+
+    def crash():
+        raise RuntimeError("crash before commit")
+    monkeypatch.setattr(db, "commit", crash)
+    with pytest.raises(RuntimeError):
+        archiver.archive(db, retention_days=30)
+    monkeypatch.undo()
+    db.rollback()
+
+    # The leftover part file covers ids 1-2, but their transcripts are still in the hot table
+    assert db.query(CallLog).filter(CallLog.transcript.isnot(None)).count() == 2
+    add_call(db, 40)
+    archiver.archive(db, retention_days=30)
+
+    ids = [r["id"] for r in archiver.query()]
+    assert sorted(ids) == [1, 2, 3]
+
+
+def test_query_pushes_down_filters(db, archiver):
+    now = datetime.now()
+    add_call(db, 40, caller_id="USR-1", sentiment="Negative", now=now)
+    add_call(db, 40, caller_id="USR-2", sentiment="Positive", now=now)
+    add_call(db, 50, caller_id="USR-1", sentiment="Positive", now=now)
+    archiver.archive(db, retention_days=30)
+    day_40 = (now - timedelta(days=40)).date()
+
+    assert [r["id"] for r in archiver.query(start_date=day_40, end_date=day_40, caller_id="USR-1")] == [1]
+    assert sorted(r["id"] for r in archiver.query(sentiment="Positive")) == [2, 3]
+    assert archiver.query(end_date=day_40 - timedelta(days=20)) == []
+    assert len(archiver.query(limit=2)) == 2
+    assert archiver.query(columns=["caller_id"], caller_id="USR-2") == [{"caller_id": "USR-2"}]
+
+
+def test_query_without_archive_returns_empty(archiver):
+    assert archiver.query(start_date=date.today()) == []
+    assert not os.path.exists(archiver.root)
+
+
+def test_rows_without_transcript_are_left_in_hot_table(db, archiver):
+    call = add_call(db, 40, summary="x" * 1000)
+    call.transcript = None
+    db.commit()
+
+    assert archiver.archive(db, retention_days=30)["archived"] == 0
+    db.refresh(call)
+    assert len(call.summary) == 1000
+    assert archiver.query() == []
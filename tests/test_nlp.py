@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from app.services.nlp import NLPService
+
+
+class FakeClient:
+    def __init__(self, response=None, error=None):
+        self.response = response
+        self.error = error
+
+    def generate(self, **kwargs):
+        if self.error:
+            raise self.error
+        return self.response
+
+
+def classify(response=None, error=None, text="I smell gas in the kitchen"):
+    service = NLPService()
+    service.client = FakeClient(response, error)
+    return asyncio.run(service.classify_intent(text))
+
+
+def ollama_response(text, done_reason="stop"):
+    return {
+        "response": text,
+        "done_reason": done_reason,
+        "prompt_eval_count": 12,
+        "eval_count": 20,
+        "eval_duration": 150_000_000,
+    }
+
+
+def test_valid_llm_output_is_typed_and_reports_usage():
+    result = classify(ollama_response('{"issue_type": "Gas", "urgency": "Emergency", "sentiment": "Negative"}'))
+
+    assert result["issue_type"] == "Gas"
+    assert result["urgency"] == "Emergency"
+    assert result["usage"]["prompt_tokens"] == 12
+    assert result["usage"]["completion_tokens"] == 20
+    assert result["usage"]["generation_ms"] == 150.0
+
+
+def test_llm_fire_or_gas_is_always_an_emergency():
+    result = classify(ollama_response('{"issue_type": "Gas", "urgency": "Urgent", "sentiment": "Neutral"}'))
+
+    assert result["issue_type"] == "Gas"
+    assert result["urgency"] == "Emergency"
+
+
+@pytest.mark.parametrize("response", [
+    ollama_response('{"issue_type": "Gas", "urgency": "Emer', done_reason="length"),
+    ollama_response('{"issue_type": "Flood", "urgency": "Emergency", "sentiment": "Neutral"}'),
+])
+def test_unusable_llm_output_falls_back_but_keeps_usage(response):
+    result = classify(response)
+
+    assert result["issue_type"] == "Gas"
+    assert result["usage"]["completion_tokens"] == 20
+
+
+def test_ollama_failure_falls_back_without_usage():
+    result = classify(error=ConnectionError("ollama down"), text="there is smoke in the hallway")
+
+    assert result["issue_type"] == "Fire"
+    assert result["urgency"] == "Emergency"
+    assert result["usage"] is None